@@ -16,12 +16,17 @@ DATABASE_PATH = "blockchain_data.db"
 # Dashboard configuration
 DASH_HOST = "127.0.0.1"
 DASH_PORT = 8050
-DASH_DEBUG = True
+DASH_DEBUG = os.getenv("DASH_DEBUG", "true").lower() in ("1", "true", "yes")
 
 # Monitoring configuration
 MAX_STORED_TRANSACTIONS = 10000
 MAX_STORED_BLOCKS = 1000
 
+# Ingestion batching: flush buffered transactions to SQLite once this many
+# have accumulated, or after this many seconds, whichever comes first
+TX_FLUSH_BATCH_SIZE = 200
+TX_FLUSH_INTERVAL = 1.0
+
 # Specific addresses to monitor (can be configured via environment variables)
 MONITORED_ADDRESSES = os.getenv("MONITORED_ADDRESSES", "").split(",") if os.getenv("MONITORED_ADDRESSES") else []
 
@@ -3,25 +3,231 @@ Web dashboard for visualizing blockchain data
 """
 
 import dash
-from dash import dcc, html, Input, Output, dash_table
-import plotly.graph_objs as go
-import plotly.express as px
+from dash import dcc, html, Input, Output, State, dash_table, no_update
+from flask_caching import Cache
+from flask_compress import Compress
+import plotly.io as pio
+import numpy as np
 import pandas as pd
 import sqlite3
 from datetime import datetime, timedelta
 import threading
 import time
 
+import hotcache
 from database import DatabaseManager
 from config import DASH_HOST, DASH_PORT, DASH_DEBUG, DATABASE_PATH
 
+# Serialize figure payloads with orjson when available (3-5x faster than
+# the stdlib encoder for the chart JSON Dash ships every tick)
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = "orjson"
+except ImportError:
+    pass
+
 # Initialize the Dash app
 app = dash.Dash(__name__)
 app.title = "Blockchain Tracking Dashboard"
 
+# WSGI entry point for production servers, e.g.:
+#   gunicorn -w 4 -k gthread --threads 2 -b 127.0.0.1:8050 dashboard:server
+server = app.server
+
+# Compress JSON responses (figure payloads shrink 5-10x on the wire)
+Compress(server)
+
 # Initialize database manager
 db_manager = DatabaseManager()
 
+# Cache query results for a few seconds so N browser tabs share one DB read
+cache = Cache(app.server, config={
+    'CACHE_TYPE': 'SimpleCache',
+    'CACHE_DEFAULT_TIMEOUT': 4
+})
+
+# SQL statements used every tick, kept as constants so the connection's
+# statement cache can reuse the prepared form across refreshes
+SQL_HIGH_VALUE = """
+    SELECT hash, total_output_value, time
+    FROM transactions
+    WHERE total_output_value > 100000000
+    ORDER BY created_at DESC
+    LIMIT 5
+"""
+
+SQL_REALTIME_ACTIVITY = """
+    SELECT
+        (SELECT COUNT(*) FROM transactions WHERE created_at > ?),
+        (SELECT COUNT(*) FROM blocks WHERE created_at > ?),
+        (SELECT hash FROM transactions ORDER BY created_at DESC LIMIT 1)
+"""
+
+SQL_VOLUME = """
+    SELECT
+        (strftime('%s', created_at) / 60) * 60 as bucket,
+        COUNT(*) as tx_count,
+        SUM(total_output_value) / 100000000.0 as total_btc
+    FROM transactions
+    WHERE created_at > datetime('now', '-1 hour')
+    GROUP BY bucket
+    ORDER BY bucket
+"""
+
+SQL_RECENT_BLOCKS = """
+    SELECT height, n_tx, size, time
+    FROM blocks
+    ORDER BY created_at DESC
+    LIMIT 20
+"""
+
+SQL_MAX_FEE = """
+    SELECT MAX(fee)
+    FROM transactions
+    WHERE fee > 0 AND created_at > datetime('now', '-1 hour')
+"""
+
+SQL_FEE_HISTOGRAM = """
+    SELECT CAST(fee / ? AS INT) * ? AS bucket, COUNT(*) AS c
+    FROM transactions
+    WHERE fee > 0 AND created_at > datetime('now', '-1 hour')
+    GROUP BY bucket
+    ORDER BY bucket
+"""
+
+FEE_HISTOGRAM_BINS = 50
+
+SQL_RECENT_TRANSACTIONS = """
+    SELECT
+        hash,
+        time,
+        total_output_value / 100000000.0 as value_btc,
+        fee
+    FROM transactions
+    ORDER BY created_at DESC
+    LIMIT 50
+"""
+
+# Figure layouts are immutable across ticks; build them once and return raw
+# figure dicts so plotly skips go.Figure validation on every refresh
+VOLUME_LAYOUT = {
+    'title': "Transaction Activity (Last Hour)",
+    'xaxis': {'title': "Time"},
+    'yaxis': {'title': "Transactions per Minute"},
+    'hovermode': 'x unified'
+}
+
+BLOCKS_LAYOUT = {
+    'title': "Transactions per Block (Recent 20 Blocks)",
+    'xaxis': {'title': "Block Height"},
+    'yaxis': {'title': "Number of Transactions"}
+}
+
+FEES_LAYOUT = {
+    'title': "Transaction Fee Distribution (Last Hour)",
+    'xaxis': {'title': "Fee (satoshis)"},
+    'yaxis': {'title': "Number of Transactions"}
+}
+
+# Thread-local storage for SQLite connections (one per Dash worker thread)
+_local = threading.local()
+
+def get_conn() -> sqlite3.Connection:
+    """Get a shared, tuned SQLite connection for the current thread"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, isolation_level=None,
+                               cached_statements=128)
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA wal_autocheckpoint=1000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-65536")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        _local.conn = conn
+    return conn
+
+@cache.memoize(timeout=4)
+def fetch_network_stats():
+    """Fetch network statistics (shared across clients for a few seconds)"""
+    return db_manager.get_network_statistics()
+
+@cache.memoize(timeout=4)
+def fetch_high_value_transactions():
+    """Fetch recent high-value transactions as (hash, total_output_value, time) rows"""
+    # Serve from the in-process ring buffer when the ingestion pipeline
+    # runs in this process; fall back to SQLite otherwise
+    if hotcache.recent_transactions:
+        hits = [tx for tx in hotcache.recent_transactions
+                if tx['total_output_value'] > 100_000_000]
+        return [(tx['hash'], tx['total_output_value'], tx['time'])
+                for tx in reversed(hits[-5:])]
+    return get_conn().execute(SQL_HIGH_VALUE).fetchall()
+
+@cache.memoize(timeout=4)
+def fetch_realtime_activity():
+    """Fetch recent activity counters and the latest transaction hash"""
+    cursor = get_conn().cursor()
+
+    # Compute the cutoff once in Python so SQLite doesn't re-evaluate
+    # datetime('now', ...) for each subquery
+    cutoff = (datetime.utcnow() - timedelta(minutes=5)).strftime('%Y-%m-%d %H:%M:%S')
+    cursor.execute(SQL_REALTIME_ACTIVITY, (cutoff, cutoff))
+    recent_txs, recent_blocks, latest_tx = cursor.fetchone()
+    latest_tx_hash = latest_tx[:16] + "..." if latest_tx else "None"
+
+    return recent_txs, recent_blocks, latest_tx_hash
+
+@cache.memoize(timeout=4)
+def fetch_transaction_volume():
+    """Fetch per-minute transaction volume for the last hour"""
+    # Bucket by integer division on the unix epoch instead of
+    # datetime(..., 'start of minute'), which re-parses the timestamp per row
+    df = pd.read_sql_query(SQL_VOLUME, get_conn())
+    df['time'] = pd.to_datetime(df['bucket'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
+    return df
+
+@cache.memoize(timeout=4)
+def fetch_recent_blocks():
+    """Fetch the most recent blocks as (height, n_tx, size, time) rows"""
+    return get_conn().execute(SQL_RECENT_BLOCKS).fetchall()
+
+@cache.memoize(timeout=4)
+def fetch_fee_histogram():
+    """Fetch pre-binned fee histogram buckets for the last hour"""
+    if hotcache.recent_transactions:
+        cutoff = time.time() - 3600
+        fees = [tx['fee'] for tx in hotcache.recent_transactions
+                if tx['fee'] > 0 and tx['created_at'] > cutoff]
+        if not fees:
+            return {'bucket': [], 'count': []}
+        binsize = max(max(fees) // FEE_HISTOGRAM_BINS, 1)
+        counts = {}
+        for fee in fees:
+            bucket = (fee // binsize) * binsize
+            counts[bucket] = counts.get(bucket, 0) + 1
+        buckets = sorted(counts)
+        return {'bucket': buckets, 'count': [counts[b] for b in buckets]}
+
+    conn = get_conn()
+    max_fee = conn.execute(SQL_MAX_FEE).fetchone()[0]
+    if not max_fee:
+        return {'bucket': [], 'count': []}
+    binsize = max(max_fee // FEE_HISTOGRAM_BINS, 1)
+    rows = conn.execute(SQL_FEE_HISTOGRAM, (binsize, binsize)).fetchall()
+    return {'bucket': [row[0] for row in rows], 'count': [row[1] for row in rows]}
+
+@cache.memoize(timeout=4)
+def fetch_recent_transactions():
+    """Fetch recent transactions as (hash, time, value_btc, fee) rows"""
+    if hotcache.recent_transactions:
+        latest = list(hotcache.recent_transactions)[-50:]
+        return [(tx['hash'], tx['time'], tx['total_output_value'] / 100_000_000, tx['fee'])
+                for tx in reversed(latest)]
+    return get_conn().execute(SQL_RECENT_TRANSACTIONS).fetchall()
+
 # Dashboard layout
 app.layout = html.Div([
     html.Div([
@@ -84,23 +290,100 @@ app.layout = html.Div([
             )
         ], style={'backgroundColor': '#ecf0f1', 'padding': 20, 'margin': 10, 'borderRadius': 10}),
         
+        # Shared per-tick data, filled by load_shared_data
+        dcc.Store(id='shared-data'),
+
         # Auto-refresh component
         dcc.Interval(
             id='interval-component',
-            interval=5*1000,  # Update every 5 seconds
+            interval=10*1000,  # Update every 10 seconds
+            n_intervals=0
+        ),
+
+        # Cheap client-side tick that pauses the refresh while the tab is hidden
+        dcc.Interval(
+            id='visibility-interval',
+            interval=2*1000,
             n_intervals=0
         )
     ], style={'fontFamily': 'Arial, sans-serif', 'backgroundColor': '#bdc3c7', 'minHeight': '100vh', 'padding': 20})
 ])
 
+# Disable the refresh interval while the browser tab is hidden; runs
+# entirely in the browser so hidden tabs stop hitting the server
+app.clientside_callback(
+    "function(n) { return document.visibilityState === 'hidden'; }",
+    Output('interval-component', 'disabled'),
+    Input('visibility-interval', 'n_intervals')
+)
+
 @app.callback(
-    Output('network-stats', 'children'),
+    Output('shared-data', 'data'),
     Input('interval-component', 'n_intervals')
 )
-def update_network_stats(n):
+def load_shared_data(n):
+    """Run all DB reads once per tick and share the result with every panel"""
     try:
-        stats = db_manager.get_network_statistics()
-        
+        volume_df = fetch_transaction_volume()
+        block_rows = sorted(fetch_recent_blocks())  # sort by height for display
+        high_value_rows = fetch_high_value_transactions()
+        recent_txs, recent_blocks, latest_tx_hash = fetch_realtime_activity()
+
+        return {
+            'stats': fetch_network_stats(),
+            'high_value': {
+                'value_btc': [row[1] / 100_000_000 for row in high_value_rows],
+                'time': [row[2] for row in high_value_rows]
+            },
+            'activity': {
+                'recent_txs': recent_txs,
+                'recent_blocks': recent_blocks,
+                'latest_tx_hash': latest_tx_hash
+            },
+            'volume': {
+                'time': volume_df['time'].tolist(),
+                'tx_count': volume_df['tx_count'].tolist()
+            },
+            'blocks': {
+                'height': [row[0] for row in block_rows],
+                'n_tx': [row[1] for row in block_rows]
+            },
+            'fees': fetch_fee_histogram(),
+            'table': format_transactions_table(fetch_recent_transactions())
+        }
+    except Exception as e:
+        return {'error': str(e)}
+
+def format_transactions_table(rows: list) -> list:
+    """Format (hash, time, value_btc, fee) rows for the DataTable"""
+    if not rows:
+        return []
+
+    # Vectorized epoch-to-string conversion; much cheaper than a per-row
+    # datetime.fromtimestamp().strftime() round trip
+    times = np.array([row[1] for row in rows], dtype='datetime64[s]').astype(str)
+    times = np.char.replace(times, 'T', ' ')
+
+    return [
+        {
+            'hash': tx_hash[:16] + "...",
+            'time': time_str,
+            'value_btc': value_btc,
+            'fee': fee
+        }
+        for (tx_hash, _, value_btc, fee), time_str in zip(rows, times)
+    ]
+
+@app.callback(
+    Output('network-stats', 'children'),
+    Input('shared-data', 'data')
+)
+def update_network_stats(data):
+    try:
+        if not data or 'error' in data:
+            raise ValueError(data.get('error', 'no data') if data else 'no data')
+        stats = data['stats']
+
         return html.Div([
             html.P(f"📊 Total Transactions: {stats['transaction_count']:,}"),
             html.P(f"🧱 Total Blocks: {stats['block_count']:,}"),
@@ -113,68 +396,41 @@ def update_network_stats(n):
 
 @app.callback(
     Output('high-value-txs', 'children'),
-    Input('interval-component', 'n_intervals')
+    Input('shared-data', 'data')
 )
-def update_high_value_transactions(n):
+def update_high_value_transactions(data):
     try:
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            df = pd.read_sql_query("""
-                SELECT hash, total_output_value, time 
-                FROM transactions 
-                WHERE total_output_value > 100000000 
-                ORDER BY created_at DESC 
-                LIMIT 5
-            """, conn)
-        
-        if df.empty:
+        if not data or 'error' in data:
+            raise ValueError(data.get('error', 'no data') if data else 'no data')
+        high_value = data['high_value']
+
+        if not high_value['value_btc']:
             return html.P("No high-value transactions yet")
-        
-        transactions = []
-        for _, row in df.iterrows():
-            btc_value = row['total_output_value'] / 100_000_000
-            tx_time = datetime.fromtimestamp(row['time']).strftime('%H:%M:%S')
-            transactions.append(
-                html.P(f"💎 {btc_value:.2f} BTC at {tx_time}", 
-                       style={'margin': 5, 'fontSize': 12})
-            )
-        
-        return html.Div(transactions)
+
+        line_style = {'margin': 5, 'fontSize': 12}
+        return html.Div([
+            html.P(f"💎 {btc_value:.2f} BTC at "
+                   f"{datetime.fromtimestamp(tx_time).strftime('%H:%M:%S')}",
+                   style=line_style)
+            for btc_value, tx_time in zip(high_value['value_btc'], high_value['time'])
+        ])
     except Exception as e:
         return html.P(f"Error: {str(e)}", style={'color': 'red'})
 
 @app.callback(
     Output('realtime-activity', 'children'),
-    Input('interval-component', 'n_intervals')
+    Input('shared-data', 'data')
 )
-def update_realtime_activity(n):
+def update_realtime_activity(data):
     try:
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            # Get activity from last 5 minutes
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT COUNT(*) FROM transactions 
-                WHERE created_at > datetime('now', '-5 minutes')
-            """)
-            recent_txs = cursor.fetchone()[0]
-            
-            cursor.execute("""
-                SELECT COUNT(*) FROM blocks 
-                WHERE created_at > datetime('now', '-5 minutes')
-            """)
-            recent_blocks = cursor.fetchone()[0]
-            
-            cursor.execute("""
-                SELECT hash FROM transactions 
-                ORDER BY created_at DESC 
-                LIMIT 1
-            """)
-            latest_tx = cursor.fetchone()
-            latest_tx_hash = latest_tx[0][:16] + "..." if latest_tx else "None"
-        
+        if not data or 'error' in data:
+            raise ValueError(data.get('error', 'no data') if data else 'no data')
+        activity = data['activity']
+
         return html.Div([
-            html.P(f"🔄 Last 5 min: {recent_txs} transactions"),
-            html.P(f"🧱 Last 5 min: {recent_blocks} blocks"),
-            html.P(f"🆕 Latest TX: {latest_tx_hash}"),
+            html.P(f"🔄 Last 5 min: {activity['recent_txs']} transactions"),
+            html.P(f"🧱 Last 5 min: {activity['recent_blocks']} blocks"),
+            html.P(f"🆕 Latest TX: {activity['latest_tx_hash']}"),
             html.P(f"⏰ Updated: {datetime.now().strftime('%H:%M:%S')}")
         ])
     except Exception as e:
@@ -182,144 +438,100 @@ def update_realtime_activity(n):
 
 @app.callback(
     Output('transaction-volume-chart', 'figure'),
-    Input('interval-component', 'n_intervals')
+    Input('shared-data', 'data')
 )
-def update_transaction_volume_chart(n):
+def update_transaction_volume_chart(data):
     try:
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            df = pd.read_sql_query("""
-                SELECT 
-                    datetime(created_at, 'localtime') as time,
-                    COUNT(*) as tx_count,
-                    SUM(total_output_value) / 100000000.0 as total_btc
-                FROM transactions 
-                WHERE created_at > datetime('now', '-1 hour')
-                GROUP BY datetime(created_at, 'localtime', 'start of minute')
-                ORDER BY time
-            """, conn)
-        
-        if df.empty:
+        if not data or 'error' in data:
+            raise ValueError(data.get('error', 'no data') if data else 'no data')
+        volume = data['volume']
+
+        if not volume['time']:
             return {"data": [], "layout": {"title": "No data available"}}
-        
-        df['time'] = pd.to_datetime(df['time'])
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df['time'],
-            y=df['tx_count'],
-            mode='lines+markers',
-            name='Transactions per minute',
-            line=dict(color='#3498db', width=2)
-        ))
-        
-        fig.update_layout(
-            title="Transaction Activity (Last Hour)",
-            xaxis_title="Time",
-            yaxis_title="Transactions per Minute",
-            hovermode='x unified'
-        )
-        
-        return fig
+
+        return {
+            'data': [{
+                'type': 'scatter',
+                'mode': 'lines+markers',
+                'x': volume['time'],
+                'y': volume['tx_count'],
+                'name': 'Transactions per minute',
+                'line': {'color': '#3498db', 'width': 2}
+            }],
+            'layout': VOLUME_LAYOUT
+        }
     except Exception as e:
         return {"data": [], "layout": {"title": f"Error: {str(e)}"}}
 
 @app.callback(
     Output('blocks-chart', 'figure'),
-    Input('interval-component', 'n_intervals')
+    Input('shared-data', 'data')
 )
-def update_blocks_chart(n):
+def update_blocks_chart(data):
     try:
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            df = pd.read_sql_query("""
-                SELECT height, n_tx, size, time
-                FROM blocks 
-                ORDER BY created_at DESC 
-                LIMIT 20
-            """, conn)
-        
-        if df.empty:
+        if not data or 'error' in data:
+            raise ValueError(data.get('error', 'no data') if data else 'no data')
+        blocks = data['blocks']
+
+        if not blocks['height']:
             return {"data": [], "layout": {"title": "No block data available"}}
-        
-        df = df.sort_values('height')  # Sort by height for proper display
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=df['height'],
-            y=df['n_tx'],
-            name='Transactions',
-            marker_color='#e74c3c'
-        ))
-        
-        fig.update_layout(
-            title="Transactions per Block (Recent 20 Blocks)",
-            xaxis_title="Block Height",
-            yaxis_title="Number of Transactions"
-        )
-        
-        return fig
+
+        return {
+            'data': [{
+                'type': 'bar',
+                'x': blocks['height'],
+                'y': blocks['n_tx'],
+                'name': 'Transactions',
+                'marker': {'color': '#e74c3c'}
+            }],
+            'layout': BLOCKS_LAYOUT
+        }
     except Exception as e:
         return {"data": [], "layout": {"title": f"Error: {str(e)}"}}
 
 @app.callback(
     Output('fees-chart', 'figure'),
-    Input('interval-component', 'n_intervals')
+    Input('shared-data', 'data')
 )
-def update_fees_chart(n):
+def update_fees_chart(data):
     try:
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            df = pd.read_sql_query("""
-                SELECT fee
-                FROM transactions 
-                WHERE fee > 0 AND created_at > datetime('now', '-1 hour')
-                ORDER BY created_at DESC
-                LIMIT 1000
-            """, conn)
-        
-        if df.empty:
+        if not data or 'error' in data:
+            raise ValueError(data.get('error', 'no data') if data else 'no data')
+        fees = data['fees']
+
+        if not fees['bucket']:
             return {"data": [], "layout": {"title": "No fee data available"}}
-        
-        fig = px.histogram(
-            df, 
-            x='fee', 
-            nbins=50,
-            title="Transaction Fee Distribution (Last Hour)",
-            labels={'fee': 'Fee (satoshis)', 'count': 'Number of Transactions'}
-        )
-        
-        fig.update_traces(marker_color='#9b59b6')
-        
-        return fig
+
+        return {
+            'data': [{
+                'type': 'bar',
+                'x': fees['bucket'],
+                'y': fees['count'],
+                'marker': {'color': '#9b59b6'}
+            }],
+            'layout': FEES_LAYOUT
+        }
     except Exception as e:
         return {"data": [], "layout": {"title": f"Error: {str(e)}"}}
 
 @app.callback(
     Output('transactions-table', 'data'),
-    Input('interval-component', 'n_intervals')
+    Input('shared-data', 'data'),
+    State('transactions-table', 'data')
 )
-def update_transactions_table(n):
+def update_transactions_table(data, current_rows):
     try:
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            df = pd.read_sql_query("""
-                SELECT 
-                    hash,
-                    time,
-                    total_output_value / 100000000.0 as value_btc,
-                    fee
-                FROM transactions 
-                ORDER BY created_at DESC 
-                LIMIT 50
-            """, conn)
-        
-        if df.empty:
-            return []
-        
-        # Format the time column
-        df['time'] = pd.to_datetime(df['time'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Truncate hash for display
-        df['hash'] = df['hash'].str[:16] + "..."
-        
-        return df.to_dict('records')
+        if not data or 'error' in data:
+            raise ValueError(data.get('error', 'no data') if data else 'no data')
+        table = data['table']
+
+        # Skip the resend and browser re-render when no new rows arrived
+        if (current_rows and table
+                and current_rows[0].get('hash') == table[0]['hash']
+                and len(current_rows) == len(table)):
+            return no_update
+
+        return table
     except Exception as e:
         return [{"hash": f"Error: {str(e)}", "time": "", "value_btc": 0, "fee": 0}]
 
@@ -3,29 +3,91 @@ Database management for blockchain tracking system
 """
 
 import sqlite3
-import json
 import asyncio
+import threading
+import time
 from datetime import datetime
 from typing import List, Optional
 import logging
 
+import numpy as np
+
+import hotcache
 from models import Transaction, Block, AddressSubscription
-from config import DATABASE_PATH, MAX_STORED_TRANSACTIONS, MAX_STORED_BLOCKS
+from config import (
+    DATABASE_PATH, MAX_STORED_TRANSACTIONS, MAX_STORED_BLOCKS,
+    TX_FLUSH_BATCH_SIZE, TX_FLUSH_INTERVAL
+)
 
 logger = logging.getLogger(__name__)
 
+# SQLite's conservative host-parameter limit; multi-row inserts are
+# chunked so each statement stays under it
+_SQLITE_MAX_VARS = 999
+
+def _insert_rows(cursor, sql_prefix: str, row_width: int, rows: list):
+    """Insert rows using multi-row VALUES statements
+
+    A single statement with N value tuples parses once and steps once,
+    where executemany still steps the statement per row.
+    """
+    if not rows:
+        return
+    placeholder = "(" + ",".join("?" * row_width) + ")"
+    rows_per_stmt = _SQLITE_MAX_VARS // row_width
+    for start in range(0, len(rows), rows_per_stmt):
+        chunk = rows[start:start + rows_per_stmt]
+        cursor.execute(
+            sql_prefix + ",".join([placeholder] * len(chunk)),
+            [value for row in chunk for value in row]
+        )
+
 class DatabaseManager:
     def __init__(self, db_path: str = DATABASE_PATH):
         self.db_path = db_path
+        self._local = threading.local()
+        self._tx_buffer: List[Transaction] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._tx_inserts_since_cleanup = 0
+        self._block_inserts_since_cleanup = 0
         self.init_database()
     
     def get_connection(self):
-        """Get a database connection"""
-        return sqlite3.connect(self.db_path)
+        """Get a database connection with WAL mode and tuned PRAGMAs"""
+        conn = sqlite3.connect(self.db_path)
+        # C-implemented rows with key access; avoids building a Python
+        # dict per row in the getters
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        # WAL only applies to on-disk databases
+        if self.db_path != ":memory:":
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA wal_autocheckpoint=1000")
+            cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-65536")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def get_pooled_connection(self):
+        """Get a long-lived connection for the current thread
+
+        Opening a fresh connection per call replays the pragmas and throws
+        away SQLite's page cache each time; reusing one per thread keeps
+        the cache warm across calls.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.get_connection()
+            self._local.conn = conn
+        return conn
     
     def init_database(self):
         """Initialize the database with required tables"""
-        with self.get_connection() as conn:
+        conn = self.get_pooled_connection()
+        with conn:
             cursor = conn.cursor()
             
             # Transactions table
@@ -124,6 +186,23 @@ class DatabaseManager:
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+
+            # Materialized counters maintained by the write path so the
+            # statistics query doesn't aggregate the transactions table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stats_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+            # Per-5-minute transaction counts for the last-hour figure
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stats_tx_buckets (
+                    bucket INTEGER PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )
+            """)
             
             # Create indexes for better performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_hash ON transactions (hash)")
@@ -132,129 +211,237 @@ class DatabaseManager:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_blocks_height ON blocks (height)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_outputs_addr ON transaction_outputs (addr)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_inputs_addr ON transaction_inputs (prev_addr)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_created ON transactions (created_at DESC)")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_transactions_high_value
+                ON transactions (total_output_value)
+                WHERE total_output_value > 100000000
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_created_fee ON transactions (created_at, fee)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_blocks_created ON blocks (created_at DESC)")
             
             conn.commit()
             logger.info("Database initialized successfully")
     
     async def store_transaction(self, transaction: Transaction):
-        """Store a transaction in the database"""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Insert main transaction record
-                cursor.execute("""
-                    INSERT OR IGNORE INTO transactions 
-                    (hash, tx_index, time, size, version, lock_time, vin_sz, vout_sz, 
-                     relayed_by, total_input_value, total_output_value, fee, raw_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    transaction.hash,
-                    transaction.tx_index,
-                    transaction.time,
-                    transaction.size,
-                    transaction.ver,
-                    transaction.lock_time,
-                    transaction.vin_sz,
-                    transaction.vout_sz,
-                    transaction.relayed_by,
-                    transaction.total_input_value,
-                    transaction.total_output_value,
-                    transaction.fee,
-                    json.dumps(transaction.model_dump())
-                ))
-                
-                # Insert transaction inputs
-                for inp in transaction.inputs:
-                    cursor.execute("""
-                        INSERT INTO transaction_inputs 
-                        (transaction_hash, sequence, prev_tx_index, prev_addr, prev_value, script)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        transaction.hash,
-                        inp.sequence,
-                        inp.prev_out.get('tx_index'),
-                        inp.prev_out.get('addr'),
-                        inp.prev_out.get('value'),
-                        inp.script
-                    ))
-                
-                # Insert transaction outputs
-                for out in transaction.out:
-                    cursor.execute("""
-                        INSERT INTO transaction_outputs 
-                        (transaction_hash, addr, value, n, spent, tx_index, type, script)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        transaction.hash,
-                        out.addr,
-                        out.value,
-                        out.n,
-                        out.spent,
-                        out.tx_index,
-                        out.type,
-                        out.script
-                    ))
-                
-                conn.commit()
-                
-                # Update address statistics if we're monitoring any addresses
-                await self._update_address_statistics(transaction)
-                
-                # Clean up old transactions if we exceed the limit
+        """Queue a transaction for batched storage"""
+        self._tx_buffer.append(transaction)
+
+        # Lazily start the timer that flushes partial batches so a quiet
+        # mempool doesn't leave transactions sitting in the buffer
+        if self._flush_task is None:
+            self._flush_lock = asyncio.Lock()
+            self._flush_task = asyncio.create_task(self._flush_timer())
+
+        if len(self._tx_buffer) >= TX_FLUSH_BATCH_SIZE:
+            await self._flush_tx_buffer()
+
+    async def flush(self):
+        """Flush any buffered transactions to the database"""
+        if self._flush_lock is not None:
+            await self._flush_tx_buffer()
+
+    async def _flush_timer(self):
+        """Periodically flush partial batches for bounded latency"""
+        while True:
+            await asyncio.sleep(TX_FLUSH_INTERVAL)
+            await self._flush_tx_buffer()
+
+    async def _flush_tx_buffer(self):
+        """Write all buffered transactions under a single commit"""
+        async with self._flush_lock:
+            if not self._tx_buffer:
+                return
+            batch = self._tx_buffer
+            self._tx_buffer = []
+
+            # Run the blocking sqlite work in a worker thread so the
+            # commit fsync doesn't stall the websocket event loop; the
+            # flush lock already serializes writers
+            try:
+                await asyncio.to_thread(self._write_tx_batch, batch)
+            except Exception as e:
+                logger.error(f"Error storing transaction batch of {len(batch)}: {e}")
+                return
+
+            # Mirror the hot columns into the in-process ring buffer
+            for tx in batch:
+                hotcache.add_transaction(
+                    tx.hash,
+                    tx.time,
+                    tx.total_output_value,
+                    tx.fee
+                )
+
+            # Cleanup is O(table size), so only check every ~1000
+            # inserts rather than on every flush
+            self._tx_inserts_since_cleanup += len(batch)
+            if self._tx_inserts_since_cleanup >= 1000:
+                self._tx_inserts_since_cleanup = 0
                 await self._cleanup_old_transactions()
-                
-        except Exception as e:
-            logger.error(f"Error storing transaction {transaction.hash}: {e}")
+
+    def _write_tx_batch(self, batch: List[Transaction]):
+        """Blocking insert of a transaction batch; runs off the event loop"""
+        conn = self.get_pooled_connection()
+        try:
+            cursor = conn.cursor()
+
+            # One explicit transaction so the whole batch shares a
+            # single commit/fsync
+            cursor.execute("BEGIN IMMEDIATE")
+
+            # raw_data is left NULL: serializing the full model to JSON
+            # duplicated every column below plus the inputs/outputs rows
+            _insert_rows(cursor, """
+                INSERT OR IGNORE INTO transactions
+                (hash, tx_index, time, size, version, lock_time, vin_sz, vout_sz,
+                 relayed_by, total_input_value, total_output_value, fee)
+                VALUES """, 12, [
+                (
+                    tx.hash,
+                    tx.tx_index,
+                    tx.time,
+                    tx.size,
+                    tx.ver,
+                    tx.lock_time,
+                    tx.vin_sz,
+                    tx.vout_sz,
+                    tx.relayed_by,
+                    tx.total_input_value,
+                    tx.total_output_value,
+                    tx.fee
+                )
+                for tx in batch
+            ])
+
+            _insert_rows(cursor, """
+                INSERT INTO transaction_inputs
+                (transaction_hash, sequence, prev_tx_index, prev_addr, prev_value, script)
+                VALUES """, 6, [
+                (
+                    tx.hash,
+                    inp.sequence,
+                    inp.prev_out.get('tx_index'),
+                    inp.prev_out.get('addr'),
+                    inp.prev_out.get('value'),
+                    inp.script
+                )
+                for tx in batch
+                for inp in tx.inputs
+            ])
+
+            _insert_rows(cursor, """
+                INSERT INTO transaction_outputs
+                (transaction_hash, addr, value, n, spent, tx_index, type, script)
+                VALUES """, 8, [
+                (
+                    tx.hash,
+                    out.addr,
+                    out.value,
+                    out.n,
+                    out.spent,
+                    out.tx_index,
+                    out.type,
+                    out.script
+                )
+                for tx in batch
+                for out in tx.out
+            ])
+
+            # Update address statistics if we're monitoring any addresses
+            for tx in batch:
+                self._update_address_statistics(cursor, tx)
+
+            # Maintain the materialized counters in the same commit
+            cursor.executemany("""
+                INSERT INTO stats_counters (name, value) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+            """, [
+                ('tx_count', len(batch)),
+                ('tx_volume', sum(tx.total_output_value for tx in batch)),
+                ('tx_fee_sum', sum(tx.fee for tx in batch)),
+            ])
+            bucket = (int(time.time()) // 300) * 300
+            cursor.execute("""
+                INSERT INTO stats_tx_buckets (bucket, value) VALUES (?, ?)
+                ON CONFLICT(bucket) DO UPDATE SET value = value + excluded.value
+            """, (bucket, len(batch)))
+
+            conn.commit()
+
+        except Exception:
+            conn.rollback()
+            raise
     
     async def store_block(self, block: Block):
         """Store a block in the database"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    INSERT OR IGNORE INTO blocks 
-                    (hash, height, block_index, prev_block_index, time, size, version,
-                     merkle_root, nonce, bits, n_tx, total_btc_sent, estimated_btc_sent, 
-                     reward, raw_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    block.hash,
-                    block.height,
-                    block.blockIndex,
-                    block.prevBlockIndex,
-                    block.time,
-                    block.size,
-                    block.version,
-                    block.mrklRoot,
-                    block.nonce,
-                    block.bits,
-                    block.nTx,
-                    block.totalBTCSent,
-                    block.estimatedBTCSent,
-                    block.reward,
-                    json.dumps(block.model_dump())
-                ))
-                
-                conn.commit()
-                
-                # Clean up old blocks if we exceed the limit
-                await self._cleanup_old_blocks()
-                
+            await asyncio.to_thread(self._write_block, block)
         except Exception as e:
             logger.error(f"Error storing block {block.hash}: {e}")
+            return
+
+        hotcache.add_block(block.hash, block.height, block.time, block.nTx, block.size)
+
+        # Blocks arrive every few minutes; checking the limit every
+        # 10 inserts is still far more often than needed
+        self._block_inserts_since_cleanup += 1
+        if self._block_inserts_since_cleanup >= 10:
+            self._block_inserts_since_cleanup = 0
+            await self._cleanup_old_blocks()
+
+    def _write_block(self, block: Block):
+        """Blocking insert of a block; runs off the event loop"""
+        conn = self.get_pooled_connection()
+        try:
+            cursor = conn.cursor()
+
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                INSERT OR IGNORE INTO blocks
+                (hash, height, block_index, prev_block_index, time, size, version,
+                 merkle_root, nonce, bits, n_tx, total_btc_sent, estimated_btc_sent,
+                 reward)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                block.hash,
+                block.height,
+                block.blockIndex,
+                block.prevBlockIndex,
+                block.time,
+                block.size,
+                block.version,
+                block.mrklRoot,
+                block.nonce,
+                block.bits,
+                block.nTx,
+                block.totalBTCSent,
+                block.estimatedBTCSent,
+                block.reward
+            ))
+
+            conn.commit()
+
+        except Exception:
+            conn.rollback()
+            raise
     
     async def store_address_subscription(self, subscription: AddressSubscription):
         """Store an address subscription"""
+        conn = self.get_pooled_connection()
         try:
-            with self.get_connection() as conn:
+            with conn:
                 cursor = conn.cursor()
-                
+
+                # ON CONFLICT updates the row in place; INSERT OR REPLACE
+                # would delete and reinsert, wiping the accumulated
+                # counters maintained by _update_address_statistics
                 cursor.execute("""
-                    INSERT OR REPLACE INTO address_subscriptions 
+                    INSERT INTO address_subscriptions
                     (address, subscribed_at, transaction_count, total_received, total_sent)
                     VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(address) DO UPDATE SET
+                        subscribed_at = excluded.subscribed_at
                 """, (
                     subscription.address,
                     subscription.subscribed_at,
@@ -267,60 +454,107 @@ class DatabaseManager:
                 
         except Exception as e:
             logger.error(f"Error storing address subscription {subscription.address}: {e}")
-    
-    async def _update_address_statistics(self, transaction: Transaction):
-        """Update statistics for monitored addresses"""
+
+    async def store_address_subscriptions_bulk(self, subscriptions: List[AddressSubscription]):
+        """Store many address subscriptions under a single commit"""
+        if not subscriptions:
+            return
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Check if any outputs go to monitored addresses
-                for out in transaction.out:
-                    if out.addr:
-                        cursor.execute("""
-                            UPDATE address_subscriptions 
-                            SET transaction_count = transaction_count + 1,
-                                total_received = total_received + ?,
-                                last_activity = CURRENT_TIMESTAMP
-                            WHERE address = ?
-                        """, (out.value, out.addr))
-                
-                # Check if any inputs come from monitored addresses
-                for inp in transaction.inputs:
-                    if inp.prev_out.get('addr'):
-                        cursor.execute("""
-                            UPDATE address_subscriptions 
-                            SET total_sent = total_sent + ?,
-                                last_activity = CURRENT_TIMESTAMP
-                            WHERE address = ?
-                        """, (inp.prev_out.get('value', 0), inp.prev_out.get('addr')))
-                
-                conn.commit()
-                
+            await asyncio.to_thread(self._write_subscriptions, subscriptions)
         except Exception as e:
-            logger.error(f"Error updating address statistics: {e}")
+            logger.error(f"Error storing {len(subscriptions)} address subscriptions: {e}")
+
+    def _write_subscriptions(self, subscriptions: List[AddressSubscription]):
+        """Blocking bulk upsert of subscriptions; runs off the event loop"""
+        conn = self.get_pooled_connection()
+        with conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO address_subscriptions
+                (address, subscribed_at, transaction_count, total_received, total_sent)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(address) DO UPDATE SET
+                    subscribed_at = excluded.subscribed_at
+            """, [
+                (
+                    sub.address,
+                    sub.subscribed_at,
+                    sub.transaction_count,
+                    sub.total_received,
+                    sub.total_sent
+                )
+                for sub in subscriptions
+            ])
+    
+    def _update_address_statistics(self, cursor, transaction: Transaction):
+        """Update statistics for monitored addresses on the caller's cursor"""
+        # Coalesce to one row per address first: transactions routinely
+        # reuse the same address across outputs/inputs, and per-row
+        # executes cost an index lookup each
+        received: dict = {}
+        for out in transaction.out:
+            if out.addr:
+                received[out.addr] = received.get(out.addr, 0) + (out.value or 0)
+
+        sent: dict = {}
+        for inp in transaction.inputs:
+            addr = inp.prev_out.get('addr')
+            if addr:
+                sent[addr] = sent.get(addr, 0) + inp.prev_out.get('value', 0)
+
+        if received:
+            cursor.executemany("""
+                UPDATE address_subscriptions
+                SET transaction_count = transaction_count + 1,
+                    total_received = total_received + ?,
+                    last_activity = CURRENT_TIMESTAMP
+                WHERE address = ?
+            """, [(value, addr) for addr, value in received.items()])
+
+        if sent:
+            cursor.executemany("""
+                UPDATE address_subscriptions
+                SET total_sent = total_sent + ?,
+                    last_activity = CURRENT_TIMESTAMP
+                WHERE address = ?
+            """, [(value, addr) for addr, value in sent.items()])
     
     async def _cleanup_old_transactions(self):
         """Remove old transactions to keep database size manageable"""
+        await asyncio.to_thread(self._cleanup_old_transactions_sync)
+
+    def _cleanup_old_transactions_sync(self):
+        conn = self.get_pooled_connection()
         try:
-            with self.get_connection() as conn:
+            with conn:
                 cursor = conn.cursor()
-                
-                cursor.execute("SELECT COUNT(*) FROM transactions")
-                count = cursor.fetchone()[0]
+
+                # id is AUTOINCREMENT and cleanup only trims the oldest
+                # rows, so the id range approximates the row count without
+                # a full-table COUNT(*)
+                cursor.execute("SELECT MAX(id) - MIN(id) + 1 FROM transactions")
+                count = cursor.fetchone()[0] or 0
                 
                 if count > MAX_STORED_TRANSACTIONS:
-                    # Delete oldest transactions
+                    # Delete oldest transactions; both the pivot lookup and
+                    # the range delete resolve via idx_transactions_created
                     to_delete = count - MAX_STORED_TRANSACTIONS
                     cursor.execute("""
-                        DELETE FROM transactions 
-                        WHERE id IN (
-                            SELECT id FROM transactions 
-                            ORDER BY created_at ASC 
-                            LIMIT ?
+                        DELETE FROM transactions
+                        WHERE created_at < (
+                            SELECT created_at FROM transactions
+                            ORDER BY created_at ASC
+                            LIMIT 1 OFFSET ?
                         )
                     """, (to_delete,))
-                    
+
+                    # Drop time buckets that can no longer fall in the
+                    # last-hour window
+                    cursor.execute(
+                        "DELETE FROM stats_tx_buckets WHERE bucket < ?",
+                        (int(time.time()) - 7200,)
+                    )
+
                     conn.commit()
                     logger.info(f"Cleaned up {to_delete} old transactions")
                     
@@ -329,25 +563,29 @@ class DatabaseManager:
     
     async def _cleanup_old_blocks(self):
         """Remove old blocks to keep database size manageable"""
+        await asyncio.to_thread(self._cleanup_old_blocks_sync)
+
+    def _cleanup_old_blocks_sync(self):
+        conn = self.get_pooled_connection()
         try:
-            with self.get_connection() as conn:
+            with conn:
                 cursor = conn.cursor()
-                
-                cursor.execute("SELECT COUNT(*) FROM blocks")
-                count = cursor.fetchone()[0]
+
+                cursor.execute("SELECT MAX(id) - MIN(id) + 1 FROM blocks")
+                count = cursor.fetchone()[0] or 0
                 
                 if count > MAX_STORED_BLOCKS:
-                    # Delete oldest blocks
+                    # Delete oldest blocks via idx_blocks_created
                     to_delete = count - MAX_STORED_BLOCKS
                     cursor.execute("""
-                        DELETE FROM blocks 
-                        WHERE id IN (
-                            SELECT id FROM blocks 
-                            ORDER BY created_at ASC 
-                            LIMIT ?
+                        DELETE FROM blocks
+                        WHERE created_at < (
+                            SELECT created_at FROM blocks
+                            ORDER BY created_at ASC
+                            LIMIT 1 OFFSET ?
                         )
                     """, (to_delete,))
-                    
+
                     conn.commit()
                     logger.info(f"Cleaned up {to_delete} old blocks")
                     
@@ -356,81 +594,106 @@ class DatabaseManager:
     
     def get_recent_transactions(self, limit: int = 100) -> List[dict]:
         """Get recent transactions"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT hash, time, total_output_value, fee 
-                FROM transactions 
-                ORDER BY created_at DESC 
-                LIMIT ?
-            """, (limit,))
-            
-            columns = [desc[0] for desc in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
-    
+        conn = self.get_pooled_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT hash, time, total_output_value, fee 
+            FROM transactions 
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, (limit,))
+
+        return [dict(row) for row in cursor.fetchall()]
+
     def get_recent_blocks(self, limit: int = 50) -> List[dict]:
         """Get recent blocks"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT hash, height, time, n_tx, size 
-                FROM blocks 
-                ORDER BY created_at DESC 
-                LIMIT ?
-            """, (limit,))
-            
-            columns = [desc[0] for desc in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
-    
+        conn = self.get_pooled_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT hash, height, time, n_tx, size 
+            FROM blocks 
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, (limit,))
+
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_recent_fee_stats(self, limit: int = 1000) -> dict:
+        """Get aggregate fee statistics over the most recent transactions
+
+        Percentiles need the raw values, so the rows are fetched and
+        aggregated with NumPy rather than per-row Python arithmetic.
+        """
+        conn = self.get_pooled_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT fee FROM transactions
+            WHERE fee IS NOT NULL
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, (limit,))
+
+        fees = np.fromiter((row[0] for row in cursor.fetchall()), dtype=np.int64)
+        if fees.size == 0:
+            return {'count': 0, 'mean_fee': 0, 'median_fee': 0, 'p95_fee': 0}
+
+        return {
+            'count': int(fees.size),
+            'mean_fee': float(fees.mean()),
+            'median_fee': float(np.median(fees)),
+            'p95_fee': float(np.percentile(fees, 95)),
+        }
+
     def get_address_statistics(self, address: str) -> Optional[dict]:
         """Get statistics for a specific address"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM address_subscriptions 
-                WHERE address = ?
-            """, (address,))
-            
-            row = cursor.fetchone()
-            if row:
-                columns = [desc[0] for desc in cursor.description]
-                return dict(zip(columns, row))
-            return None
-    
+        conn = self.get_pooled_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT * FROM address_subscriptions 
+            WHERE address = ?
+        """, (address,))
+        
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
     def get_network_statistics(self) -> dict:
         """Get overall network statistics"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            stats = {}
-            
-            # Transaction stats
-            cursor.execute("SELECT COUNT(*), AVG(fee), SUM(total_output_value) FROM transactions")
-            tx_count, avg_fee, total_volume = cursor.fetchone()
-            stats['transaction_count'] = tx_count or 0
-            stats['average_fee'] = avg_fee or 0
-            stats['total_volume'] = total_volume or 0
-            
-            # Block stats
-            cursor.execute("SELECT COUNT(*), MAX(height) FROM blocks")
-            block_count, latest_height = cursor.fetchone()
-            stats['block_count'] = block_count or 0
-            stats['latest_height'] = latest_height or 0
-            
-            # Recent activity
-            cursor.execute("""
-                SELECT COUNT(*) FROM transactions 
-                WHERE created_at > datetime('now', '-1 hour')
-            """)
-            stats['transactions_last_hour'] = cursor.fetchone()[0] or 0
-            
-            cursor.execute("""
-                SELECT COUNT(*) FROM blocks 
-                WHERE created_at > datetime('now', '-1 hour')
-            """)
-            stats['blocks_last_hour'] = cursor.fetchone()[0] or 0
-            
-            return stats
+        conn = self.get_pooled_connection()
+        cursor = conn.cursor()
+        
+        stats = {}
+
+        # Transaction stats from the materialized counters; these track
+        # everything ingested, not just rows surviving cleanup
+        cursor.execute("SELECT name, value FROM stats_counters")
+        counters = {row[0]: row[1] for row in cursor.fetchall()}
+        tx_count = counters.get('tx_count', 0)
+        stats['transaction_count'] = tx_count
+        stats['average_fee'] = counters.get('tx_fee_sum', 0) / tx_count if tx_count else 0
+        stats['total_volume'] = counters.get('tx_volume', 0)
+
+        # Block stats; the blocks table is capped at MAX_STORED_BLOCKS
+        # so these aggregates stay cheap
+        cursor.execute("SELECT COUNT(*), MAX(height) FROM blocks")
+        block_count, latest_height = cursor.fetchone()
+        stats['block_count'] = block_count or 0
+        stats['latest_height'] = latest_height or 0
+
+        # Recent activity: sum the 5-minute buckets in the last hour
+        cursor.execute("""
+            SELECT COALESCE(SUM(value), 0) FROM stats_tx_buckets
+            WHERE bucket >= ?
+        """, (int(time.time()) - 3600,))
+        stats['transactions_last_hour'] = cursor.fetchone()[0]
+
+        cursor.execute("""
+            SELECT COUNT(*) FROM blocks
+            WHERE created_at > datetime('now', '-1 hour')
+        """)
+        stats['blocks_last_hour'] = cursor.fetchone()[0] or 0
+
+        return stats
@@ -0,0 +1,33 @@
+"""
+In-memory ring buffers for the hottest recent blockchain data
+"""
+
+import time
+from collections import deque
+
+# Ring buffers sized to comfortably cover the dashboard's hot windows
+# (last hour of transactions, last 20 blocks). deque(maxlen=...) evicts
+# the oldest entry in O(1) on append.
+recent_transactions = deque(maxlen=2000)
+recent_blocks = deque(maxlen=100)
+
+def add_transaction(tx_hash: str, tx_time: int, total_output_value: int, fee: int):
+    """Record a freshly stored transaction in the hot cache"""
+    recent_transactions.append({
+        'hash': tx_hash,
+        'time': tx_time,
+        'total_output_value': total_output_value,
+        'fee': fee,
+        'created_at': time.time()
+    })
+
+def add_block(block_hash: str, height: int, block_time: int, n_tx: int, size: int):
+    """Record a freshly stored block in the hot cache"""
+    recent_blocks.append({
+        'hash': block_hash,
+        'height': height,
+        'time': block_time,
+        'n_tx': n_tx,
+        'size': size,
+        'created_at': time.time()
+    })
@@ -6,7 +6,9 @@ import asyncio
 import logging
 import signal
 import sys
-from datetime import datetime
+import time
+from collections import deque
+from datetime import timedelta
 from typing import Set
 
 from database import DatabaseManager
@@ -14,6 +16,17 @@ from websocket_client import BlockchainWebSocketClient
 from models import Transaction, Block
 from config import MONITORED_ADDRESSES, LOG_LEVEL, LOG_FILE, BLOCKCHAIN_WS_URL, DATABASE_PATH
 
+# O(1) membership checks on the hot transaction path
+MONITORED_ADDRESSES = frozenset(MONITORED_ADDRESSES)
+
+# Drop-in libuv event loop; keep the default loop when unavailable
+# (e.g. on Windows)
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 # Configure logging
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL),
@@ -34,8 +47,8 @@ class BlockchainTracker:
             'transactions_processed': 0,
             'blocks_processed': 0,
             'start_time': None,
-            'high_value_transactions': [],
-            'recent_blocks': []
+            'high_value_transactions': deque(maxlen=10),
+            'recent_blocks': deque(maxlen=5)
         }
         
         # Setup callbacks
@@ -55,24 +68,22 @@ class BlockchainTracker:
                 'fee': transaction.fee
             }
             self.stats['high_value_transactions'].append(high_value_tx)
-            
-            # Keep only last 10 high-value transactions
-            if len(self.stats['high_value_transactions']) > 10:
-                self.stats['high_value_transactions'].pop(0)
-            
+
             logger.info(f"High-value transaction detected: "
                        f"{high_value_tx['value']:.2f} BTC - {transaction.hash[:16]}...")
         
         # Check if transaction involves monitored addresses
-        for output in transaction.out:
-            if output.addr in MONITORED_ADDRESSES:
-                logger.warning(f"Transaction to monitored address {output.addr}: "
-                              f"{output.value / 100_000_000:.8f} BTC")
-        
-        for inp in transaction.inputs:
-            if inp.prev_out.get('addr') in MONITORED_ADDRESSES:
-                logger.warning(f"Transaction from monitored address {inp.prev_out.get('addr')}: "
-                              f"{inp.prev_out.get('value', 0) / 100_000_000:.8f} BTC")
+        if MONITORED_ADDRESSES:
+            for output in transaction.out:
+                if output.addr in MONITORED_ADDRESSES:
+                    logger.warning(f"Transaction to monitored address {output.addr}: "
+                                  f"{output.value / 100_000_000:.8f} BTC")
+
+            for inp in transaction.inputs:
+                addr = inp.prev_out.get('addr')
+                if addr is not None and addr in MONITORED_ADDRESSES:
+                    logger.warning(f"Transaction from monitored address {addr}: "
+                                  f"{inp.prev_out.get('value', 0) / 100_000_000:.8f} BTC")
         
         # Log stats every 100 transactions
         if self.stats['transactions_processed'] % 100 == 0:
@@ -90,11 +101,7 @@ class BlockchainTracker:
             'size': block.size
         }
         self.stats['recent_blocks'].append(block_info)
-        
-        # Keep only last 5 blocks
-        if len(self.stats['recent_blocks']) > 5:
-            self.stats['recent_blocks'].pop(0)
-        
+
         logger.info(f"New block #{block.height}: {block.nTx} transactions, "
                    f"{block.size} bytes")
     
@@ -102,11 +109,11 @@ class BlockchainTracker:
         """Log current statistics"""
         if not self.stats['start_time']:
             return
-        
-        runtime = datetime.now() - self.stats['start_time']
-        tx_rate = self.stats['transactions_processed'] / runtime.total_seconds() * 60  # per minute
-        
-        logger.info(f"Statistics - Runtime: {runtime}, "
+
+        elapsed = time.monotonic() - self.stats['start_time']
+        tx_rate = self.stats['transactions_processed'] / elapsed * 60  # per minute
+
+        logger.info(f"Statistics - Runtime: {timedelta(seconds=int(elapsed))}, "
                    f"Transactions: {self.stats['transactions_processed']}, "
                    f"Blocks: {self.stats['blocks_processed']}, "
                    f"TX Rate: {tx_rate:.1f}/min")
@@ -119,19 +126,23 @@ class BlockchainTracker:
     
     async def monitor_addresses(self, addresses: list[str]):
         """Monitor specific Bitcoin addresses"""
-        for address in addresses:
-            success = await self.ws_client.subscribe_to_address(address)
-            if success:
-                logger.info(f"Now monitoring address: {address}")
+        count = await self.ws_client.subscribe_to_addresses(addresses)
+        logger.info(f"Now monitoring {count} addresses")
     
     async def start(self):
         """Start the blockchain tracker"""
         self.is_running = True
-        self.stats['start_time'] = datetime.now()
+        self.stats['start_time'] = time.monotonic()
         
         logger.info("Starting Blockchain Tracking System...")
         logger.info(f"Monitoring {len(MONITORED_ADDRESSES)} addresses: {MONITORED_ADDRESSES}")
-        
+
+        # Register on the running loop so shutdown is scheduled on the
+        # right loop regardless of where the signal is delivered
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: asyncio.create_task(self.stop()))
+
         try:
             # Start WebSocket client with reconnection
             ws_task = asyncio.create_task(self.ws_client.run_with_reconnect())
@@ -168,26 +179,19 @@ class BlockchainTracker:
         logger.info("Stopping Blockchain Tracking System...")
         
         await self.ws_client.disconnect()
-        
+
+        # Flush any transactions still buffered for batched storage
+        await self.db_manager.flush()
+
         # Log final statistics
         await self.log_statistics()
         
         logger.info("Blockchain Tracking System stopped")
-    
-    def setup_signal_handlers(self):
-        """Setup signal handlers for graceful shutdown"""
-        def signal_handler(signum, frame):
-            logger.info(f"Received signal {signum}")
-            asyncio.create_task(self.stop())
-        
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
 
 async def main():
     """Main entry point"""
     tracker = BlockchainTracker()
-    tracker.setup_signal_handlers()
-    
+
     try:
         await tracker.start()
     except KeyboardInterrupt:
@@ -2,9 +2,8 @@
 Data models for blockchain tracking system
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr, TypeAdapter
 from typing import List, Optional, Dict, Any
-from datetime import datetime
 
 class TransactionInput(BaseModel):
     sequence: int
@@ -32,21 +31,33 @@ class Transaction(BaseModel):
     vout_sz: int
     relayed_by: str
     out: List[TransactionOutput]
-    
+
+    _total_input_value: int = PrivateAttr(default=0)
+    _total_output_value: int = PrivateAttr(default=0)
+    _fee: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context) -> None:
+        """Compute derived totals once instead of on every property access"""
+        tiv = sum(inp.prev_out.get('value', 0) for inp in self.inputs)
+        tov = sum(out.value for out in self.out)
+        self._total_input_value = tiv
+        self._total_output_value = tov
+        self._fee = tiv - tov
+
     @property
     def total_input_value(self) -> int:
-        """Calculate total input value"""
-        return sum(inp.prev_out.get('value', 0) for inp in self.inputs if 'value' in inp.prev_out)
-    
+        """Total input value"""
+        return self._total_input_value
+
     @property
     def total_output_value(self) -> int:
-        """Calculate total output value"""
-        return sum(out.value for out in self.out)
-    
+        """Total output value"""
+        return self._total_output_value
+
     @property
     def fee(self) -> int:
-        """Calculate transaction fee"""
-        return self.total_input_value - self.total_output_value
+        """Transaction fee"""
+        return self._fee
 
 class Block(BaseModel):
     txIndexes: List[int]
@@ -72,7 +83,20 @@ class WebSocketMessage(BaseModel):
 
 class AddressSubscription(BaseModel):
     address: str
-    subscribed_at: datetime
+    subscribed_at: int  # ns since epoch; formatted only at display time
     transaction_count: int = 0
     total_received: int = 0
     total_sent: int = 0
+
+# Module-level adapters so the compiled core validators are built once
+# and reused for every incoming websocket frame
+_TX_ADAPTER = TypeAdapter(Transaction)
+_BLOCK_ADAPTER = TypeAdapter(Block)
+
+def parse_transaction(data: Dict[str, Any]) -> Transaction:
+    """Validate a raw websocket payload into a Transaction"""
+    return _TX_ADAPTER.validate_python(data)
+
+def parse_block(data: Dict[str, Any]) -> Block:
+    """Validate a raw websocket payload into a Block"""
+    return _BLOCK_ADAPTER.validate_python(data)
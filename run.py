@@ -8,29 +8,31 @@ import sys
 import time
 import signal
 import os
-from threading import Thread
 
-def run_tracker():
-    """Run the main blockchain tracker"""
+def start_tracker():
+    """Start the main blockchain tracker"""
     print("🔗 Starting Blockchain Tracker...")
-    try:
-        subprocess.run([sys.executable, "main.py"], check=True)
-    except KeyboardInterrupt:
-        print("Tracker stopped by user")
-    except Exception as e:
-        print(f"Tracker error: {e}")
+    # start_new_session puts each child in its own process group so we
+    # can signal it (and anything it spawns) deterministically
+    return subprocess.Popen([sys.executable, "main.py"], start_new_session=True)
 
-def run_dashboard():
-    """Run the web dashboard"""
+def start_dashboard():
+    """Start the web dashboard"""
     print("📊 Starting Web Dashboard...")
-    # Wait a bit for the tracker to start and create the database
-    time.sleep(3)
+    return subprocess.Popen([sys.executable, "dashboard.py"], start_new_session=True)
+
+def stop_process(process, name):
+    """Terminate a child's process group and wait for it to exit"""
+    if process.poll() is not None:
+        return
     try:
-        subprocess.run([sys.executable, "dashboard.py"], check=True)
-    except KeyboardInterrupt:
-        print("Dashboard stopped by user")
-    except Exception as e:
-        print(f"Dashboard error: {e}")
+        os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        print(f"{name} did not exit, killing...")
+        os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+    except ProcessLookupError:
+        pass
 
 def main():
     """Main function to run both components"""
@@ -40,29 +42,35 @@ def main():
     print("Dashboard will be available at: http://localhost:8050")
     print("Press Ctrl+C to stop both services")
     print("=" * 50)
-    
-    # Create threads for both processes
-    tracker_thread = Thread(target=run_tracker, daemon=True)
-    dashboard_thread = Thread(target=run_dashboard, daemon=True)
-    
+
+    tracker = start_tracker()
+
+    # Wait a bit for the tracker to start and create the database
+    time.sleep(3)
+    dashboard = start_dashboard()
+
     try:
-        # Start both threads
-        tracker_thread.start()
-        dashboard_thread.start()
-        
-        # Keep main thread alive
+        # Block until either child exits; no polling threads needed
         while True:
-            time.sleep(1)
-            
+            pid, status = os.waitpid(-1, 0)
+            if pid == tracker.pid:
+                print("Tracker exited")
+                break
+            if pid == dashboard.pid:
+                print("Dashboard exited")
+                break
+
     except KeyboardInterrupt:
         print("\n🛑 Shutting down Blockchain Tracking System...")
         print("Stopping all services...")
-        
-        # The daemon threads will be terminated when main thread exits
-        
+
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
 
+    finally:
+        stop_process(dashboard, "Dashboard")
+        stop_process(tracker, "Tracker")
+
 if __name__ == "__main__":
     main()
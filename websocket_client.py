@@ -6,37 +6,88 @@ import asyncio
 import json
 import logging
 import sqlite3
-from datetime import datetime
-from typing import Set, Optional, Callable
+import time
+from typing import Iterable, Set, Optional, Callable
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
+# orjson parses and serializes several times faster than stdlib json;
+# fall back silently when it isn't installed
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+    _JSONDecodeError = json.JSONDecodeError
+
 from config import BLOCKCHAIN_WS_URL, DATABASE_PATH
-from models import Transaction, Block, WebSocketMessage, AddressSubscription
+from models import (
+    Transaction, Block, AddressSubscription,
+    parse_transaction, parse_block
+)
 from database import DatabaseManager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fixed protocol frames, serialized once at import time; kept as str so
+# they go out as text frames like every other message
+_MSG_PING = '{"op":"ping"}'
+_MSG_UNCONFIRMED_SUB = '{"op":"unconfirmed_sub"}'
+_MSG_UNCONFIRMED_UNSUB = '{"op":"unconfirmed_unsub"}'
+_MSG_BLOCKS_SUB = '{"op":"blocks_sub"}'
+_MSG_BLOCKS_UNSUB = '{"op":"blocks_unsub"}'
+_MSG_PING_BLOCK = '{"op":"ping_block"}'
+_MSG_PING_TX = '{"op":"ping_tx"}'
+
+# Sends scheduled together per burst; bounds memory when re-subscribing
+# a large address watchlist after reconnect
+_SEND_WINDOW = 64
+
 class BlockchainWebSocketClient:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.websocket = None
         self.is_connected = False
         self.subscribed_addresses: Set[str] = set()
-        self.transaction_callbacks: list[Callable] = []
-        self.block_callbacks: list[Callable] = []
+        # Immutable snapshots: registration is rare, iteration is per
+        # message, and an empty tuple makes the no-callback check free
+        self.transaction_callbacks: tuple[Callable, ...] = ()
+        self.block_callbacks: tuple[Callable, ...] = ()
         self.reconnect_delay = 5  # seconds
+        # Bounded handoff between the frame reader and the handler
+        # workers; dropping a frame beats stalling the read loop
+        self._msg_queue: asyncio.Queue = asyncio.Queue(maxsize=2000)
+        self._workers: list[asyncio.Task] = []
+        self._dropped_messages = 0
+        # Deferred store tasks; the set keeps them alive until done
+        self._inflight: Set[asyncio.Task] = set()
         
     async def connect(self) -> bool:
         """Connect to the Blockchain.com WebSocket API"""
         try:
             logger.info(f"Connecting to {BLOCKCHAIN_WS_URL}")
+            # permessage-deflate cuts the highly compressible JSON feed
+            # by most of its size; larger buffers mean fewer recv() calls
+            # per burst of transactions
             self.websocket = await websockets.connect(
                 BLOCKCHAIN_WS_URL,
                 ping_interval=30,
-                ping_timeout=10
+                ping_timeout=10,
+                compression="deflate",
+                max_size=2**22,
+                max_queue=4096,
+                read_limit=2**20,
+                write_limit=2**20
             )
             self.is_connected = True
             logger.info("Successfully connected to Blockchain.com WebSocket")
@@ -48,6 +99,14 @@ class BlockchainWebSocketClient:
     
     async def disconnect(self):
         """Disconnect from the WebSocket"""
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+        # Let deferred stores finish before tearing down
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
         if self.websocket:
             await self.websocket.close()
             self.is_connected = False
@@ -55,55 +114,104 @@ class BlockchainWebSocketClient:
     
     async def send_message(self, message: dict):
         """Send a message to the WebSocket"""
-        if not self.is_connected or not self.websocket:
+        return await self._send_raw(_dumps(message))
+
+    async def _send_raw(self, payload: str) -> bool:
+        """Send an already-serialized frame"""
+        # One local lookup instead of re-checking connection flags; a
+        # dead socket surfaces through the exception path anyway
+        ws = self.websocket
+        if ws is None:
             logger.error("WebSocket not connected")
             return False
-        
+
         try:
-            await self.websocket.send(json.dumps(message))
-            logger.debug(f"Sent message: {message}")
+            await ws.send(payload)
+            logger.debug("Sent message: %s", payload)
             return True
+        except ConnectionClosed:
+            self.is_connected = False
+            logger.error("Failed to send message: connection closed")
+            return False
         except Exception as e:
             logger.error(f"Failed to send message: {e}")
             return False
     
+    async def _send_many(self, messages: list) -> bool:
+        """Send several messages in windowed bursts
+
+        Each window's sends are scheduled together so the transport can
+        coalesce the writes, while the window cap keeps thousands of
+        re-subscription frames from being buffered at once.
+        """
+        ws = self.websocket
+        if ws is None:
+            logger.error("WebSocket not connected")
+            return False
+
+        try:
+            for start in range(0, len(messages), _SEND_WINDOW):
+                await asyncio.gather(*(
+                    ws.send(m if isinstance(m, str) else _dumps(m))
+                    for m in messages[start:start + _SEND_WINDOW]
+                ))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to send messages: {e}")
+            return False
+
     async def ping(self):
         """Send a ping message"""
-        return await self.send_message({"op": "ping"})
-    
+        return await self._send_raw(_MSG_PING)
+
     async def subscribe_unconfirmed_transactions(self):
         """Subscribe to all new unconfirmed transactions"""
-        message = {"op": "unconfirmed_sub"}
-        success = await self.send_message(message)
+        success = await self._send_raw(_MSG_UNCONFIRMED_SUB)
         if success:
             logger.info("Subscribed to unconfirmed transactions")
         return success
-    
+
     async def unsubscribe_unconfirmed_transactions(self):
         """Unsubscribe from unconfirmed transactions"""
-        message = {"op": "unconfirmed_unsub"}
-        success = await self.send_message(message)
+        success = await self._send_raw(_MSG_UNCONFIRMED_UNSUB)
         if success:
             logger.info("Unsubscribed from unconfirmed transactions")
         return success
     
     async def subscribe_to_address(self, address: str):
         """Subscribe to transactions for a specific Bitcoin address"""
-        message = {"op": "addr_sub", "addr": address}
-        success = await self.send_message(message)
-        if success:
-            self.subscribed_addresses.add(address)
-            # Store subscription in database
-            subscription = AddressSubscription(
-                address=address,
-                subscribed_at=datetime.now()
-            )
-            await self.db_manager.store_address_subscription(subscription)
-            logger.info(f"Subscribed to address: {address}")
-        return success
+        if address in self.subscribed_addresses:
+            return True
+        return await self.subscribe_to_addresses([address]) == 1
+
+    async def subscribe_to_addresses(self, addresses: Iterable[str]) -> int:
+        """Subscribe to many Bitcoin addresses with one DB commit
+
+        Sends the addr_sub frames back-to-back and stores all resulting
+        subscriptions in a single bulk write, so re-subscribing a large
+        watchlist doesn't pay one commit per address.
+        """
+        subscribed_at = time.time_ns()
+        subscriptions = []
+        for address in addresses:
+            if address in self.subscribed_addresses:
+                continue
+            message = {"op": "addr_sub", "addr": address}
+            if await self.send_message(message):
+                self.subscribed_addresses.add(address)
+                subscriptions.append(AddressSubscription(
+                    address=address,
+                    subscribed_at=subscribed_at
+                ))
+                logger.info(f"Subscribed to address: {address}")
+
+        await self.db_manager.store_address_subscriptions_bulk(subscriptions)
+        return len(subscriptions)
     
     async def unsubscribe_from_address(self, address: str):
         """Unsubscribe from a Bitcoin address"""
+        if address not in self.subscribed_addresses:
+            return True
         message = {"op": "addr_unsub", "addr": address}
         success = await self.send_message(message)
         if success:
@@ -113,70 +221,89 @@ class BlockchainWebSocketClient:
     
     async def subscribe_to_blocks(self):
         """Subscribe to new block notifications"""
-        message = {"op": "blocks_sub"}
-        success = await self.send_message(message)
+        success = await self._send_raw(_MSG_BLOCKS_SUB)
         if success:
             logger.info("Subscribed to new blocks")
         return success
-    
+
     async def unsubscribe_from_blocks(self):
         """Unsubscribe from block notifications"""
-        message = {"op": "blocks_unsub"}
-        success = await self.send_message(message)
+        success = await self._send_raw(_MSG_BLOCKS_UNSUB)
         if success:
             logger.info("Unsubscribed from blocks")
         return success
     
     def add_transaction_callback(self, callback: Callable):
         """Add a callback function for new transactions"""
-        self.transaction_callbacks.append(callback)
-    
+        self.transaction_callbacks = self.transaction_callbacks + (callback,)
+
     def add_block_callback(self, callback: Callable):
         """Add a callback function for new blocks"""
-        self.block_callbacks.append(callback)
+        self.block_callbacks = self.block_callbacks + (callback,)
     
     async def handle_message(self, message_data: dict):
         """Handle incoming WebSocket messages"""
         try:
-            message = WebSocketMessage(**message_data)
-            
-            if message.op == "utx" and message.x:
+            # Dispatch on the op tag directly; wrapping every frame in a
+            # WebSocketMessage added a second validation pass for nothing
+            op = message_data.get("op")
+            x = message_data.get("x")
+
+            if op == "utx" and x:
                 # New unconfirmed transaction
-                transaction = Transaction(**message.x)
-                logger.info(f"New transaction: {transaction.hash[:16]}... "
-                           f"(Value: {transaction.total_output_value} satoshis)")
+                transaction = parse_transaction(x)
+                # Per-transaction logging costs a format + handler write
+                # per frame; only pay for it when debugging
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("New transaction: %s... (Value: %s satoshis)",
+                                 transaction.hash[:16], transaction.total_output_value)
                 
-                # Store in database
-                await self.db_manager.store_transaction(transaction)
+                # Schedule the store instead of awaiting it; the handler
+                # returns immediately so the worker can drain the next
+                # frame even while a batch flush is in progress
+                task = asyncio.create_task(self.db_manager.store_transaction(transaction))
+                self._inflight.add(task)
+                task.add_done_callback(self._on_store_done)
                 
-                # Call registered callbacks
-                for callback in self.transaction_callbacks:
-                    try:
-                        await callback(transaction)
-                    except Exception as e:
-                        logger.error(f"Transaction callback error: {e}")
+                if not self.transaction_callbacks:
+                    return
+
+                # Call registered callbacks concurrently so one slow
+                # callback doesn't serialize the rest
+                results = await asyncio.gather(
+                    *(callback(transaction) for callback in self.transaction_callbacks),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error(f"Transaction callback error: {result}")
             
-            elif message.op == "block" and message.x:
+            elif op == "block" and x:
                 # New block
-                block = Block(**message.x)
-                logger.info(f"New block: {block.height} "
-                           f"(Hash: {block.hash[:16]}..., Transactions: {block.nTx})")
+                block = parse_block(x)
+                logger.info("New block: %s (Hash: %s..., Transactions: %s)",
+                            block.height, block.hash[:16], block.nTx)
                 
                 # Store in database
                 await self.db_manager.store_block(block)
                 
-                # Call registered callbacks
-                for callback in self.block_callbacks:
-                    try:
-                        await callback(block)
-                    except Exception as e:
-                        logger.error(f"Block callback error: {e}")
+                if not self.block_callbacks:
+                    return
+
+                # Call registered callbacks concurrently
+                results = await asyncio.gather(
+                    *(callback(block) for callback in self.block_callbacks),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error(f"Block callback error: {result}")
             
-            elif message.op == "ping":
+            elif op == "ping":
                 logger.debug("Received ping")
-            
+
             else:
-                logger.debug(f"Received message: {message.op}")
+                logger.debug(f"Received message: {op}")
                 
         except Exception as e:
             logger.error(f"Error handling message: {e}")
@@ -190,12 +317,19 @@ class BlockchainWebSocketClient:
         try:
             async for message in self.websocket:
                 try:
-                    data = json.loads(message)
-                    await self.handle_message(data)
-                except json.JSONDecodeError as e:
+                    data = _loads(message)
+                except _JSONDecodeError as e:
                     logger.error(f"Failed to parse JSON: {e}")
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}")
+                    continue
+
+                try:
+                    self._msg_queue.put_nowait(data)
+                except asyncio.QueueFull:
+                    self._dropped_messages += 1
+                    if self._dropped_messages % 100 == 1:
+                        logger.warning(
+                            f"Message queue full; dropped {self._dropped_messages} messages so far"
+                        )
         except ConnectionClosed:
             logger.warning("WebSocket connection closed")
             self.is_connected = False
@@ -203,8 +337,29 @@ class BlockchainWebSocketClient:
             logger.error(f"WebSocket error: {e}")
             self.is_connected = False
     
+    def _on_store_done(self, task: asyncio.Task):
+        """Retire a deferred store task and surface any failure"""
+        self._inflight.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Deferred transaction store failed: {task.exception()}")
+
+    async def _consume(self):
+        """Drain the message queue and run handlers"""
+        while True:
+            data = await self._msg_queue.get()
+            try:
+                await self.handle_message(data)
+            except Exception as e:
+                logger.error(f"Error processing message: {e}")
+            finally:
+                self._msg_queue.task_done()
+
     async def run_with_reconnect(self):
         """Run the WebSocket client with automatic reconnection"""
+        # Handler workers outlive individual connections
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._consume()) for _ in range(4)]
+
         while True:
             try:
                 if not self.is_connected:
@@ -214,10 +369,15 @@ class BlockchainWebSocketClient:
                         await asyncio.sleep(self.reconnect_delay)
                         continue
                 
-                # Subscribe to default streams
-                await self.subscribe_unconfirmed_transactions()
-                await self.subscribe_to_blocks()
-                
+                # Re-establish the default streams and any address
+                # subscriptions in a single send burst
+                messages = [_MSG_UNCONFIRMED_SUB, _MSG_BLOCKS_SUB]
+                messages.extend(
+                    {"op": "addr_sub", "addr": addr}
+                    for addr in self.subscribed_addresses
+                )
+                await self._send_many(messages)
+
                 # Listen for messages
                 await self.listen()
                 
@@ -228,8 +388,8 @@ class BlockchainWebSocketClient:
     
     async def ping_latest_block(self):
         """Request the latest block for debugging"""
-        return await self.send_message({"op": "ping_block"})
-    
+        return await self._send_raw(_MSG_PING_BLOCK)
+
     async def ping_latest_transaction(self):
         """Request the latest transaction for debugging"""
-        return await self.send_message({"op": "ping_tx"})
+        return await self._send_raw(_MSG_PING_TX)